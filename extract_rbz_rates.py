@@ -3,8 +3,15 @@ from requests.adapters import HTTPAdapter, Retry
 import pdfplumber
 import pandas as pd
 import os
+import re
+import shutil
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import datetime, timedelta
 
+# Local PDF naming schemes: as downloaded from RBZ, and as stored in the archive
+RBZ_PDF_PATTERN = re.compile(r"^RATES_(\d{1,2})_([A-Za-z]+)_(\d{4})\.pdf$", re.IGNORECASE)
+ARCHIVE_PDF_PATTERN = re.compile(r"^exchange_rates_(\d{4})_(\d{2})_(\d{2})\.pdf$")
+
 def download_pdf_for_date(year, month, day):
     try:
         url = f"https://www.rbz.co.zw/documents/Exchange_Rates/{year}/{month}/RATES_{day}_{month}_{year}.pdf"
@@ -67,7 +74,19 @@ def make_column_names_unique(headers):
             unique_headers.append(col)
     return unique_headers
 
-def save_to_formats(headers, data, pdf_path, date_str):
+def archive_paths(date_str):
+    # Define file paths for each format
+    return {
+        "pdf": f"Archive/pdf/exchange_rates_{date_str}.pdf",
+        "excel": f"Archive/excel/exchange_rates_{date_str}.xlsx",
+        "json": f"Archive/json/exchange_rates_{date_str}.json",
+        "csv": f"Archive/csv/exchange_rates_{date_str}.csv",
+        "xml": f"Archive/xml/exchange_rates_{date_str}.xml",
+        "html": f"Archive/html/exchange_rates_{date_str}.html",
+        "markdown": f"Archive/markdown/exchange_rates_{date_str}.md"
+    }
+
+def save_to_formats(headers, data, pdf_path, date_str, overwrite=False, keep_pdf=False):
     try:
         # Ensure headers are valid XML tags
         headers = [header.replace(" ", "_").replace(".", "_") for header in headers]
@@ -85,33 +104,28 @@ def save_to_formats(headers, data, pdf_path, date_str):
             if not os.path.exists(fmt_folder):
                 os.makedirs(fmt_folder)
 
-        # Define file paths for each format
-        file_paths = {
-            "pdf": f"Archive/pdf/exchange_rates_{date_str}.pdf",
-            "excel": f"Archive/excel/exchange_rates_{date_str}.xlsx",
-            "json": f"Archive/json/exchange_rates_{date_str}.json",
-            "csv": f"Archive/csv/exchange_rates_{date_str}.csv",
-            "xml": f"Archive/xml/exchange_rates_{date_str}.xml",
-            "html": f"Archive/html/exchange_rates_{date_str}.html",
-            "markdown": f"Archive/markdown/exchange_rates_{date_str}.md"
-        }
+        file_paths = archive_paths(date_str)
 
-        # Save the downloaded PDF if it doesn't already exist
+        # Save the source PDF if it doesn't already exist; local PDFs being
+        # replayed are copied so the originals stay where they are
         if not os.path.exists(file_paths["pdf"]):
-            os.rename(pdf_path, file_paths["pdf"])
-        
-        # Save to various formats if the file doesn't already exist
-        if not os.path.exists(file_paths["excel"]):
+            if keep_pdf:
+                shutil.copy2(pdf_path, file_paths["pdf"])
+            else:
+                os.rename(pdf_path, file_paths["pdf"])
+
+        # Save to various formats if the file doesn't already exist (or always, when overwriting)
+        if overwrite or not os.path.exists(file_paths["excel"]):
             df.to_excel(file_paths["excel"], index=False)
-        if not os.path.exists(file_paths["json"]):
+        if overwrite or not os.path.exists(file_paths["json"]):
             df.to_json(file_paths["json"], orient='records')
-        if not os.path.exists(file_paths["csv"]):
+        if overwrite or not os.path.exists(file_paths["csv"]):
             df.to_csv(file_paths["csv"], index=False)
-        if not os.path.exists(file_paths["xml"]):
+        if overwrite or not os.path.exists(file_paths["xml"]):
             df.to_xml(file_paths["xml"], index=False)
-        if not os.path.exists(file_paths["html"]):
+        if overwrite or not os.path.exists(file_paths["html"]):
             df.to_html(file_paths["html"], index=False)
-        if not os.path.exists(file_paths["markdown"]):
+        if overwrite or not os.path.exists(file_paths["markdown"]):
             df.to_markdown(file_paths["markdown"], index=False)
 
         return True
@@ -144,5 +158,96 @@ def update_archive_for_year(year):
                 print(f"No data extracted for {date_str}")
         current_date += delta
 
+def date_from_pdf_name(filename):
+    # Returns the archive date string (YYYY_MM_DD) encoded in a PDF file name, or None
+    match = RBZ_PDF_PATTERN.match(filename)
+    if match:
+        day, month, year = match.groups()
+        try:
+            date = datetime.strptime(f"{int(day):02d} {month.capitalize()} {year}", "%d %B %Y")
+        except ValueError:
+            return None
+        return date.strftime("%Y_%m_%d")
+
+    match = ARCHIVE_PDF_PATTERN.match(filename)
+    if match:
+        try:
+            date = datetime(*(int(part) for part in match.groups()))
+        except ValueError:
+            return None
+        return date.strftime("%Y_%m_%d")
+
+    return None
+
+def find_local_pdfs(directories=(os.path.join('Archive', 'pdf'), '.')):
+    # Map each date to one local PDF; earlier directories take precedence
+    pdfs = {}
+    for directory in directories:
+        if not os.path.isdir(directory):
+            continue
+        for filename in sorted(os.listdir(directory)):
+            date_str = date_from_pdf_name(filename)
+            if date_str and date_str not in pdfs:
+                pdfs[date_str] = os.path.join(directory, filename)
+    return pdfs
+
+def replay_pdf(pdf_path, date_str, overwrite=False):
+    data = extract_exchange_rates(pdf_path)
+    if not data:
+        print(f"No data extracted for {date_str}")
+        return False
+    headers, cleaned_data = clean_data(data)
+    return save_to_formats(headers, cleaned_data, pdf_path, date_str, overwrite=overwrite, keep_pdf=True)
+
+def replay_local_pdfs(directories=(os.path.join('Archive', 'pdf'), '.'), overwrite=False, max_workers=None):
+    # Rebuild the archive from PDFs already on disk, without touching the network
+    pdfs = find_local_pdfs(directories)
+
+    # Dates whose derived files are all present are skipped unless overwriting
+    if not overwrite:
+        pdfs = {
+            date_str: pdf_path for date_str, pdf_path in pdfs.items()
+            if not all(os.path.exists(path) for path in archive_paths(date_str).values())
+        }
+    if not pdfs:
+        print("Archive is up to date, nothing to replay")
+        return
+
+    # Create the folders up front so the workers don't race to create them
+    for fmt_folder in {os.path.dirname(path) for path in archive_paths("").values()}:
+        os.makedirs(fmt_folder, exist_ok=True)
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(replay_pdf, pdf_path, date_str, overwrite): date_str
+            for date_str, pdf_path in sorted(pdfs.items())
+        }
+        for future in as_completed(futures):
+            date_str = futures[future]
+            try:
+                success = future.result()
+            except Exception as e:
+                print(f"Error replaying exchange rates for {date_str}: {e}")
+                success = False
+            if success:
+                print(f"Successfully archived exchange rates for {date_str}")
+            else:
+                print(f"Failed to archive exchange rates for {date_str}")
+
 if __name__ == '__main__':
-    update_archive_for_year(2024)
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Archive RBZ exchange rates in various formats")
+    parser.add_argument("--replay", action="store_true",
+                        help="rebuild the archive from local PDFs instead of downloading")
+    parser.add_argument("--overwrite", action="store_true",
+                        help="regenerate derived files that already exist (replay only)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="number of worker processes for replay (default: CPU count)")
+    parser.add_argument("--year", type=int, default=2024, help="year to download (default: 2024)")
+    args = parser.parse_args()
+
+    if args.replay:
+        replay_local_pdfs(overwrite=args.overwrite, max_workers=args.workers)
+    else:
+        update_archive_for_year(args.year)